@@ -3,22 +3,46 @@
 Network discovery script to find devices on the local network
 """
 
+import asyncio
+import errno
+import functools
+import os
+import selectors
 import socket
 import subprocess
 import ipaddress
-import threading
+import struct
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
+
+# Port used to probe liveness during the sweep; a refused connection still
+# proves the host is up (it answered with RST). Windows retries the SYN
+# after an RST and only reports the refusal after ~2 s, so the timeout has
+# to outlast that or closed-port hosts are counted as down
+PROBE_PORT = 445
+PROBE_TIMEOUT = 3.0
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+
+_LOCAL_IP = None
+
+def get_local_ip():
+    """Get local IP address, resolved once per process"""
+    global _LOCAL_IP
+    if _LOCAL_IP is None:
+        # Get local IP by connecting to a remote address
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.connect(("8.8.8.8", 80))
+            _LOCAL_IP = s.getsockname()[0]
+    return _LOCAL_IP
 
 def get_local_ip_info():
     """Get local IP address and network information"""
     print("=== Local Network Information ===")
     
     try:
-        # Get local IP by connecting to a remote address
-        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
-            s.connect(("8.8.8.8", 80))
-            local_ip = s.getsockname()[0]
+        local_ip = get_local_ip()
         
         print(f"Local IP Address: {local_ip}")
         
@@ -32,10 +56,91 @@ def get_local_ip_info():
         print(f"Error getting network info: {e}")
         return None, None
 
+class IcmpPinger:
+    """Send ICMP echo requests from one socket instead of a ping process per host"""
+    
+    def __init__(self):
+        try:
+            # Raw ICMP needs admin (Windows) or root
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+        except PermissionError:
+            # Unprivileged ICMP datagram sockets (Linux/macOS); raises where unsupported
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+        self.sock.setblocking(False)
+        self.ident = os.getpid() & 0xFFFF
+    
+    @staticmethod
+    def checksum(data):
+        if len(data) % 2:
+            data += b"\0"
+        total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+        total = (total >> 16) + (total & 0xFFFF)
+        total += total >> 16
+        return ~total & 0xFFFF
+    
+    def echo_packet(self, seq):
+        header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, 0, self.ident, seq)
+        return struct.pack(
+            "!BBHHH", ICMP_ECHO_REQUEST, 0, self.checksum(header), self.ident, seq
+        )
+    
+    def ping_many(self, ips, timeout=1.0):
+        """Ping every address at once and return the set that replied"""
+        pending = set()
+        for seq, ip in enumerate(map(str, ips)):
+            try:
+                self.sock.sendto(self.echo_packet(seq & 0xFFFF), (ip, 0))
+                pending.add(ip)
+            except OSError:
+                pass
+        
+        alive = set()
+        deadline = time.monotonic() + timeout
+        with selectors.DefaultSelector() as sel:
+            sel.register(self.sock, selectors.EVENT_READ)
+            while pending - alive:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not sel.select(remaining):
+                    break
+                try:
+                    data, (addr, _) = self.sock.recvfrom(1024)
+                except BlockingIOError:
+                    continue
+                # Raw sockets, and datagram sockets on macOS, deliver the IP
+                # header too; Linux datagram sockets start at the ICMP header
+                if data[0] >> 4 == 4:
+                    data = data[(data[0] & 0x0F) * 4:]
+                # Raw sockets see every ICMP packet, not just our replies
+                if self.sock.type == socket.SOCK_RAW and struct.unpack("!H", data[4:6])[0] != self.ident:
+                    continue
+                if data[0] == ICMP_ECHO_REPLY and addr in pending:
+                    alive.add(addr)
+        
+        return alive
+    
+    def close(self):
+        self.sock.close()
+
+_pinger = None
+
+def get_pinger():
+    """Return a shared IcmpPinger, or None if ICMP sockets are not permitted"""
+    global _pinger
+    if _pinger is None:
+        try:
+            _pinger = IcmpPinger()
+        except OSError:
+            _pinger = False
+    return _pinger or None
+
 def ping_host(ip):
     """Ping a single host"""
+    pinger = get_pinger()
+    if pinger is not None:
+        return ip, str(ip) in pinger.ping_many([ip])
+    
     try:
-        # Use Windows ping command
+        # Fall back to the Windows ping command
         result = subprocess.run(
             ["ping", "-n", "1", "-w", "1000", str(ip)], 
             capture_output=True, 
@@ -46,25 +151,69 @@ def ping_host(ip):
     except:
         return ip, False
 
-def scan_network(network, max_workers=50):
+async def probe_host(ip, port=PROBE_PORT, timeout=PROBE_TIMEOUT):
+    """Check whether a host answers a TCP connect"""
+    try:
+        _, writer = await asyncio.wait_for(
+            asyncio.open_connection(str(ip), port), timeout
+        )
+        writer.close()
+        return ip, True
+    except ConnectionRefusedError:
+        return ip, True
+    except (OSError, asyncio.TimeoutError):
+        return ip, False
+
+def host_range(network):
+    """Usable host addresses of a network as a range of integers"""
+    first = int(network.network_address)
+    if network.num_addresses <= 2:
+        return range(first, first + network.num_addresses)
+    return range(first + 1, first + network.num_addresses - 1)
+
+async def _scan_hosts(hosts, max_concurrent, on_active):
+    # A fixed set of workers pulls from one shared iterator, so no per-host
+    # task or result list is ever materialized
+    hosts = iter(hosts)
+
+    async def worker():
+        for host in hosts:
+            # Format the dotted quad only when the probe is dispatched
+            ip = socket.inet_ntoa(struct.pack("!I", host))
+            _, is_active = await probe_host(ip)
+            if is_active:
+                on_active(ip)
+
+    await asyncio.gather(*(worker() for _ in range(max_concurrent)))
+
+def scan_network(network, max_concurrent=256):
     """Scan network for active hosts"""
     print(f"\n=== Scanning Network {network} ===")
     print("This may take a moment...")
     
     active_hosts = []
     
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit ping tasks for all IPs in the network
-        futures = {executor.submit(ping_host, ip): ip for ip in network.hosts()}
-        
-        for future in as_completed(futures):
-            ip, is_active = future.result()
-            if is_active:
-                active_hosts.append(str(ip))
-                print(f"✅ Found active host: {ip}")
+    def report(ip):
+        active_hosts.append(ip)
+        print(f"✅ Found active host: {ip}")
+    
+    pinger = get_pinger()
+    if pinger is not None:
+        # Every echo goes out back to back on one socket, then a single
+        # select loop collects the replies
+        ips = [socket.inet_ntoa(struct.pack("!I", host)) for host in host_range(network)]
+        alive = pinger.ping_many(ips)
+        for ip in ips:
+            if ip in alive:
+                report(ip)
+    else:
+        # No ICMP socket allowed: one event loop drives a TCP probe per host
+        # instead of a ping process per host
+        asyncio.run(_scan_hosts(host_range(network), max_concurrent, report))
     
     return active_hosts
 
+@functools.lru_cache(maxsize=4096)
 def get_hostname(ip):
     """Try to get hostname for an IP"""
     try:
@@ -73,31 +222,64 @@ def get_hostname(ip):
     except:
         return "Unknown"
 
-def check_specific_ports(ip, ports=[22, 80, 443, 12355, 5000, 8000, 8080]):
+def check_specific_ports(ip, ports=[22, 80, 443, 12355, 5000, 8000, 8080], timeout=1):
     """Check specific ports on a host"""
-    open_ports = []
+    found = set()
+    sel = selectors.DefaultSelector()
     
-    for port in ports:
-        try:
+    try:
+        # Start every connect at once so the host costs one timeout, not one per port
+        for port in ports:
             sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(1)
+            sock.setblocking(False)
             result = sock.connect_ex((str(ip), port))
             if result == 0:
-                open_ports.append(port)
-            sock.close()
-        except:
-            pass
+                found.add(port)
+                sock.close()
+            elif result in (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN):
+                sel.register(sock, selectors.EVENT_WRITE, port)
+            else:
+                sock.close()
+        
+        deadline = time.monotonic() + timeout
+        while sel.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            for key, _ in sel.select(remaining):
+                sock = key.fileobj
+                if sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+                    found.add(key.data)
+                sel.unregister(sock)
+                sock.close()
+    finally:
+        for key in list(sel.get_map().values()):
+            key.fileobj.close()
+        sel.close()
     
-    return open_ports
+    return [port for port in ports if port in found]
+
+async def _analyze(hosts, max_workers=64):
+    loop = asyncio.get_running_loop()
+    # Reverse DNS and the per-host port selects both block, so fan them
+    # out over one shared pool
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        hostnames = asyncio.gather(
+            *(loop.run_in_executor(executor, get_hostname, ip) for ip in hosts)
+        )
+        open_ports = asyncio.gather(
+            *(loop.run_in_executor(executor, check_specific_ports, ip) for ip in hosts)
+        )
+        return await asyncio.gather(hostnames, open_ports)
 
 def analyze_hosts(active_hosts):
     """Analyze active hosts for more details"""
     print(f"\n=== Analyzing {len(active_hosts)} Active Hosts ===")
     
-    for ip in active_hosts:
-        hostname = get_hostname(ip)
-        open_ports = check_specific_ports(ip)
-        
+    # Hostname lookups and port checks for every host run concurrently
+    hostnames, all_open_ports = asyncio.run(_analyze(active_hosts))
+    
+    for ip, hostname, open_ports in zip(active_hosts, hostnames, all_open_ports):
         print(f"\n📍 {ip}")
         print(f"   Hostname: {hostname}")
         if open_ports:
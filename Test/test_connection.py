@@ -3,34 +3,50 @@
 Simple connection test to Mac coordinator
 """
 
-import torch
-import torch.distributed as dist
+import argparse
+import importlib
+import ipaddress
 import os
 import socket
+import threading
 import time
+from datetime import timedelta
+from pathlib import Path
 
-def test_network_connection(mac_ip, port=12355):
+# Last Mac IP that connected successfully
+MAC_IP_CACHE = Path("~/.dist_mac_ip").expanduser()
+
+def test_network_connection(mac_ip, port=12355, timeout=5):
     """Test basic network connectivity"""
     print(f"Testing network connection to {mac_ip}:{port}")
     
-    try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(5)
-        result = sock.connect_ex((mac_ip, port))
-        sock.close()
-        
-        if result == 0:
+    delay = 0.05
+    deadline = time.monotonic() + timeout
+    
+    while True:
+        try:
+            remaining = max(deadline - time.monotonic(), delay)
+            with socket.create_connection((mac_ip, port), timeout=remaining):
+                pass
             print(f"✅ Network connection to {mac_ip}:{port} successful")
             return True
-        else:
-            print(f"❌ Cannot connect to {mac_ip}:{port}")
+        except ConnectionRefusedError:
+            # Coordinator may not be listening yet; back off and retry
+            if time.monotonic() + delay > deadline:
+                print(f"❌ Cannot connect to {mac_ip}:{port}")
+                return False
+            time.sleep(delay)
+            delay = min(delay * 2, 8)
+        except Exception as e:
+            print(f"❌ Network test failed: {e}")
             return False
-    except Exception as e:
-        print(f"❌ Network test failed: {e}")
-        return False
 
-def test_simple_distributed_init(mac_ip, port="12355"):
+def test_simple_distributed_init(mac_ip, port="12355", timeout=30):
     """Test simple distributed initialization"""
+    # Usually already loaded by the background import started in main()
+    import torch
+    import torch.distributed as dist
+    
     print(f"\nTesting distributed initialization to {mac_ip}:{port}")
     
     # Set environment variables
@@ -53,7 +69,7 @@ def test_simple_distributed_init(mac_ip, port="12355"):
             init_method=f'tcp://{mac_ip}:{port}',
             rank=1,
             world_size=2,
-            timeout=torch.distributed.constants.default_pg_timeout
+            timeout=timedelta(seconds=timeout)
         )
         
         print(f"✅ Distributed initialization successful!")
@@ -61,7 +77,7 @@ def test_simple_distributed_init(mac_ip, port="12355"):
         
         # Test a simple operation
         device = torch.device("cuda:0" if torch.cuda.is_available() else "cpu")
-        tensor = torch.tensor([1, 2, 3], dtype=torch.int64).to(device)
+        tensor = torch.arange(1, 4, dtype=torch.int64, device=device)
         print(f"Test tensor created on {device}: {tensor}")
         
         return True
@@ -76,18 +92,52 @@ def test_simple_distributed_init(mac_ip, port="12355"):
         except:
             pass
 
-def main():
-    print("🔍 Connection Test to Mac Coordinator")
-    print("=" * 50)
+def is_valid_ip(value):
+    """True for a well-formed IP address that isn't loopback"""
+    try:
+        return not ipaddress.ip_address(value).is_loopback
+    except ValueError:
+        return False
+
+def get_mac_ip(cli_ip=None):
+    """Mac IP from the command line, the cache file, or an interactive prompt"""
+    if cli_ip:
+        return cli_ip
+    
+    if MAC_IP_CACHE.exists():
+        mac_ip = MAC_IP_CACHE.read_text().strip()
+        if is_valid_ip(mac_ip):
+            print(f"Using cached Mac IP {mac_ip} from {MAC_IP_CACHE} (override with --mac-ip)")
+            return mac_ip
+        print(f"Ignoring invalid cached Mac IP {mac_ip!r} in {MAC_IP_CACHE}")
     
-    # Get Mac IP from user
     while True:
         mac_ip = input("Enter Mac's IP address: ").strip()
-        if mac_ip and mac_ip != "127.0.0.1":
-            break
+        if is_valid_ip(mac_ip):
+            return mac_ip
         print("Please enter a valid IP address (not localhost)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Connection test to the Mac coordinator")
+    parser.add_argument("--mac-ip", help="Mac coordinator IP (default: cached value or prompt)")
+    parser.add_argument("--port", type=int, default=12355)
+    parser.add_argument("--timeout", type=int, default=30,
+                        help="Seconds to wait for the coordinator before failing")
+    args = parser.parse_args()
+    if args.mac_ip and not is_valid_ip(args.mac_ip):
+        parser.error(f"--mac-ip {args.mac_ip!r} is not a valid IP address (not localhost)")
+    
+    # torch is only needed for the distributed test; import it in the
+    # background while the IP prompt and network probe run
+    threading.Thread(
+        target=importlib.import_module, args=("torch.distributed",), daemon=True
+    ).start()
+    
+    print("🔍 Connection Test to Mac Coordinator")
+    print("=" * 50)
     
-    port = 12355
+    mac_ip = get_mac_ip(args.mac_ip)
+    port = args.port
     
     # Test 1: Network connectivity
     if not test_network_connection(mac_ip, port):
@@ -99,7 +149,8 @@ def main():
         return
     
     # Test 2: Distributed initialization
-    if test_simple_distributed_init(mac_ip, str(port)):
+    if test_simple_distributed_init(mac_ip, str(port), args.timeout):
+        MAC_IP_CACHE.write_text(mac_ip)
         print("\n🎉 Connection test successful!")
         print("You can now run: python worker.py")
     else:
@@ -3,12 +3,16 @@
 Simple test script to verify Windows RTX 2050 setup without distributed training
 """
 
-import torch
 import sys
 
 def test_cuda_setup():
     """Test CUDA installation and GPU availability"""
     print("=== Windows RTX 2050 Setup Test ===")
+    
+    # torch is imported lazily so the banner and this header print before
+    # the slow import
+    import torch
+    
     print(f"PyTorch version: {torch.__version__}")
     print(f"CUDA available: {torch.cuda.is_available()}")
     
@@ -25,6 +29,8 @@ def test_cuda_setup():
 
 def test_tensor_operations():
     """Test basic tensor operations on GPU"""
+    import torch
+    
     print("\n=== GPU Tensor Operations Test ===")
     
     # Test tensor creation and movement to GPU
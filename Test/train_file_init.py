@@ -16,7 +16,10 @@ def infer_device() -> torch.device:
 def main() -> None:
     # Use file:// init method which doesn't require TCPStore
     # This works better on Windows with some PyTorch versions
-    temp_file = os.path.join(tempfile.gettempdir(), 'torch_dist_init')
+    # Keep the rendezvous file in RAM (/dev/shm) where available so ranks
+    # don't pay disk I/O on it; Windows has no tmpfs and uses %TEMP%
+    shm_dir = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    temp_file = os.path.join(shm_dir, 'torch_dist_init')
     
     # Clean up any previous file
     if os.path.exists(temp_file):
@@ -39,11 +42,14 @@ def main() -> None:
         f"hostname={socket.gethostname()}"
     )
 
-    # Simple cross-rank check: gather all ranks
-    gathered_ranks = [torch.zeros(1, dtype=torch.int64) for _ in range(world_size)]
+    # Simple cross-rank check: gather all ranks into one contiguous buffer
+    gathered_ranks = torch.empty(world_size, dtype=torch.int64)
     my_rank_tensor = torch.tensor([rank], dtype=torch.int64)
-    dist.all_gather(gathered_ranks, my_rank_tensor)
-    print(f"✅ [rank {rank}] gathered={ [int(t.item()) for t in gathered_ranks] }")
+    if hasattr(dist, "all_gather_into_tensor"):
+        dist.all_gather_into_tensor(gathered_ranks, my_rank_tensor)
+    else:
+        dist.all_gather(list(gathered_ranks.chunk(world_size)), my_rank_tensor)
+    print(f"✅ [rank {rank}] gathered={gathered_ranks.tolist()}")
 
     dist.barrier()
     print(f"✅ [rank {rank}] barrier OK; shutting down")
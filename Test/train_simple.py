@@ -1,5 +1,6 @@
 import os
 import socket
+import sys
 import torch
 import torch.distributed as dist
 
@@ -18,11 +19,24 @@ def main() -> None:
     os.environ['MASTER_PORT'] = '29500'
     os.environ['RANK'] = '0'
     os.environ['WORLD_SIZE'] = '1'
+    # Windows wheels are built without libuv; use it for the store elsewhere
+    if sys.platform != "win32":
+        os.environ.setdefault('USE_LIBUV', '1')
     
+    # Build the store once and hand it to the process group instead of
+    # letting env:// rendezvous open its own
+    store = dist.TCPStore(
+        os.environ['MASTER_ADDR'],
+        int(os.environ['MASTER_PORT']),
+        world_size=1,
+        is_master=True,
+        use_libuv=os.environ.get('USE_LIBUV') == '1'
+    )
+
     # Initialize process group with gloo backend
     dist.init_process_group(
         backend="gloo",
-        init_method='env://',
+        store=store,
         world_size=1,
         rank=0
     )
@@ -31,16 +45,27 @@ def main() -> None:
     world_size = dist.get_world_size()
     device = infer_device()
 
+    # Exchange hostnames through the store: one set per rank, one batched get
+    host_keys = [f"host_{r}" for r in range(world_size)]
+    store.set(host_keys[rank], socket.gethostname())
+    if hasattr(store, 'multi_get'):
+        hosts = [h.decode() for h in store.multi_get(host_keys)]
+    else:
+        hosts = [store.get(k).decode() for k in host_keys]
+
     print(
         f"[rank {rank}] world_size={world_size} device={device} "
-        f"hostname={socket.gethostname()}"
+        f"hostname={hosts[rank]} peers={hosts}"
     )
 
-    # Simple cross-rank check: gather all ranks
-    gathered_ranks = [torch.zeros(1, dtype=torch.int64) for _ in range(world_size)]
+    # Simple cross-rank check: gather all ranks into one contiguous buffer
+    gathered_ranks = torch.empty(world_size, dtype=torch.int64)
     my_rank_tensor = torch.tensor([rank], dtype=torch.int64)
-    dist.all_gather(gathered_ranks, my_rank_tensor)
-    print(f"[rank {rank}] gathered={ [int(t.item()) for t in gathered_ranks] }")
+    if hasattr(dist, "all_gather_into_tensor"):
+        dist.all_gather_into_tensor(gathered_ranks, my_rank_tensor)
+    else:
+        dist.all_gather(list(gathered_ranks.chunk(world_size)), my_rank_tensor)
+    print(f"[rank {rank}] gathered={gathered_ranks.tolist()}")
 
     dist.barrier()
     print(f"[rank {rank}] barrier OK; shutting down")
@@ -6,21 +6,68 @@ This script runs on the Windows machine with RTX 2050 GPU
 
 import torch
 import torch.distributed as dist
+import argparse
+import functools
+import ipaddress
+import logging
+import logging.handlers
 import os
+import queue
+import signal
 import sys
 import time
 import socket
+import threading
+from datetime import timedelta
 
-def get_local_ip():
-    """Get the local IP address of this Windows machine"""
+# Looked up once after init and reused by the tests and main loop; the store
+# is kept so the coordinator can signal shutdown
+_WORKER_STATE = {}
+SHUTDOWN_KEY = "worker_shutdown"
+
+# Bound on each store operation (connect, rendezvous key waits)
+STORE_TIMEOUT = timedelta(seconds=60)
+
+# Named rather than __name__, which is "__main__" when run as a script
+log = logging.getLogger("worker")
+
+# Only successful lookups are cached; a failure raises through the cache,
+# so the next call tries again
+@functools.lru_cache(maxsize=4)
+def _route_ip(target):
+    # Connecting a UDP socket only picks a route; nothing is sent
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.connect((target, 80))
+        return s.getsockname()[0]
+
+def get_local_ip(target="8.8.8.8"):
+    """Get the local IP address of this Windows machine on the route to target"""
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
-            s.connect(("8.8.8.8", 80))
-            local_ip = s.getsockname()[0]
-        return local_ip
+        return _route_ip(target)
     except Exception:
         return "127.0.0.1"
 
+def get_interface_name(ip):
+    """Name of the network adapter that owns ip, or None if it can't be found"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    
+    for name, addrs in psutil.net_if_addrs().items():
+        if any(a.family == socket.AF_INET and a.address == ip for a in addrs):
+            return name
+    return None
+
+# Each device query is a driver round-trip; GPU 0 doesn't change under us
+@functools.lru_cache(maxsize=1)
+def _gpu_name():
+    return torch.cuda.get_device_name(0)
+
+@functools.lru_cache(maxsize=1)
+def _gpu_props():
+    return torch.cuda.get_device_properties(0)
+
 def check_cuda_setup():
     """Check CUDA installation and GPU availability"""
     print("=== CUDA Setup Check ===")
@@ -31,8 +78,8 @@ def check_cuda_setup():
         print(f"CUDA version: {torch.version.cuda}")
         print(f"Number of GPUs: {torch.cuda.device_count()}")
         print(f"Current GPU: {torch.cuda.current_device()}")
-        print(f"GPU Name: {torch.cuda.get_device_name(0)}")
-        print(f"GPU Memory: {torch.cuda.get_device_properties(0).total_memory / 1024**3:.1f} GB")
+        print(f"GPU Name: {_gpu_name()}")
+        print(f"GPU Memory: {_gpu_props().total_memory / 1024**3:.1f} GB")
     else:
         print("❌ CUDA not available! Please install PyTorch with CUDA support:")
         print("pip install torch torchvision --index-url https://download.pytorch.org/whl/cu118")
@@ -40,156 +87,372 @@ def check_cuda_setup():
     
     return True
 
-def initialize_distributed_worker(master_addr, master_port="12355"):
+def warm_up_cuda():
+    """Create the CUDA context on a background thread while config is gathered"""
+    if torch.cuda.is_available():
+        threading.Thread(target=lambda: torch.empty(1, device='cuda'), daemon=True).start()
+
+def wait_for_port(host, port, deadline):
+    """Poll until host:port accepts a TCP connection; False once deadline passes"""
+    delay = 0.05
+    while True:
+        try:
+            with socket.create_connection((host, port), timeout=0.2):
+                return True
+        except OSError:
+            if time.monotonic() + delay > deadline:
+                return False
+            time.sleep(delay)
+            delay = min(delay * 2, 1.0)
+
+def connect_store(master_addr, master_port, world_size, timeout=30):
+    """Connect to the coordinator's TCPStore once its port accepts connections"""
+    # Cheap 200 ms probes instead of repeated store handshakes; a dead or
+    # firewalled coordinator fails here with a clear message rather than
+    # leaving the store to retry until its timeout
+    deadline = time.monotonic() + timeout
+    if not wait_for_port(master_addr, master_port, deadline):
+        raise ConnectionError(
+            f"nothing accepted a connection on {master_addr}:{master_port} within {timeout}s; "
+            "is the Mac coordinator running, and is the port open in its firewall?"
+        )
+    
+    # No use_libuv here: it only picks the server backend, and a client
+    # talks plain TCP to either one. The handshake only gets what is left
+    # of the connect budget, so probe plus connect stay within timeout
+    store = dist.TCPStore(
+        master_addr,
+        master_port,
+        world_size,
+        is_master=False,
+        timeout=timedelta(seconds=max(deadline - time.monotonic(), 0.2)),
+        # Count ourselves in the master's join counter; a coordinator store
+        # built with the default wait_for_workers=True (as the tcp:// handler
+        # does) blocks until every client has done so
+        wait_for_workers=True,
+    )
+    store.set_timeout(STORE_TIMEOUT)
+    return store
+
+def record_worker_state(store, device_id):
+    """Cache rank, world size and device once the process group is up"""
+    _WORKER_STATE.update(
+        rank=dist.get_rank(),
+        world_size=dist.get_world_size(),
+        device=torch.device("cuda:0" if torch.cuda.is_available() else "cpu"),
+        device_id=device_id,  # GPU bound to NCCL, or None
+        store=store,
+    )
+
+def initialize_distributed_worker(master_addr, master_port=12355, timeout=30, rank=1, world_size=2,
+                                  backend="gloo", collective_timeout=1800):
     """Initialize this Windows machine as a distributed worker with fixed libuv issues"""
     
     # Configuration
-    WORLD_SIZE = 2  # Mac (rank 0) + Windows (rank 1)
-    RANK = 1       # This Windows machine is rank 1
+    WORLD_SIZE = world_size  # Mac (rank 0) + Windows (rank 1 by default)
+    RANK = rank
     
-    print(f"\n=== Distributed Worker Setup ===")
-    print(f"Master Address: {master_addr}")
-    print(f"Master Port: {master_port}")
-    print(f"World Size: {WORLD_SIZE}")
-    print(f"This machine's rank: {RANK}")
+    # One write for the whole block instead of a console write per line
+    print("\n".join([
+        "\n=== Distributed Worker Setup ===",
+        f"Master Address: {master_addr}",
+        f"Master Port: {master_port}",
+        f"World Size: {WORLD_SIZE}",
+        f"This machine's rank: {RANK}",
+    ]))
     
-    # Clear environment variables that might cause libuv issues
+    # Require a numeric address (main resolves names first): Gloo would
+    # otherwise hand a hostname to the resolver on every connect retry
+    try:
+        socket.getaddrinfo(
+            master_addr, master_port,
+            family=socket.AF_INET, flags=socket.AI_NUMERICHOST
+        )
+    except socket.gaierror as e:
+        print(f"❌ Master address must be a numeric IPv4 address, got {master_addr!r}: {e}")
+        return False
+    
+    env = {
+        'MASTER_ADDR': master_addr,
+        'MASTER_PORT': str(master_port),
+        'WORLD_SIZE': str(WORLD_SIZE),
+        'RANK': str(RANK),
+        # Force specific settings to avoid libuv
+        'GLOO_DEVICE_TRANSPORT': 'TCP',
+        'GLOO_SOCKET_FAMILY': 'AF_INET',
+    }
+    
+    # Pin the transports to the adapter the OS routes to the coordinator
+    # through (not the default-route one, which may be a VPN); an empty
+    # value makes Gloo try every adapter (VPN, WSL, Hyper-V) instead
+    iface = get_interface_name(get_local_ip(master_addr))
+    if iface:
+        env.update(GLOO_SOCKET_IFNAME=iface, NCCL_SOCKET_IFNAME=iface, TP_SOCKET_IFNAME=iface)
+    
+    # Clear environment variables that might cause libuv issues, then
+    # apply the whole configuration in one pass
     env_vars_to_clear = [
         'GLOO_SOCKET_IFNAME',
-        'GLOO_DEVICE_TRANSPORT',
         'NCCL_SOCKET_IFNAME',
+        'TP_SOCKET_IFNAME',
         'NCCL_IB_DISABLE',
         'NCCL_P2P_DISABLE'
     ]
     
     for var in env_vars_to_clear:
-        if var in os.environ:
-            del os.environ[var]
-    
-    # Set required environment variables
-    os.environ['MASTER_ADDR'] = master_addr
-    os.environ['MASTER_PORT'] = master_port
-    os.environ['WORLD_SIZE'] = str(WORLD_SIZE)
-    os.environ['RANK'] = str(RANK)
+        if var not in env:
+            os.environ.pop(var, None)
+    os.environ.update(env)
     
-    # Force specific settings to avoid libuv
-    os.environ['GLOO_SOCKET_IFNAME'] = ''
-    os.environ['NCCL_SOCKET_IFNAME'] = ''
-    os.environ['GLOO_DEVICE_TRANSPORT'] = 'TCP'
-    os.environ['GLOO_SOCKET_FAMILY'] = 'AF_INET'
-    os.environ['TP_SOCKET_IFNAME'] = ''
+    # NCCL is opt-in: every rank has to join it, and the Mac coordinator
+    # (rank 0) can only run Gloo. With it, CUDA tensors go through NCCL
+    # while CPU tensors and the TCPStore rendezvous stay on Gloo
+    if backend == 'nccl':
+        if not (torch.cuda.is_available() and dist.is_nccl_available()):
+            print("❌ --backend nccl needs CUDA and a PyTorch build with NCCL")
+            return False
+        backend = 'cuda:nccl,cpu:gloo'
+        # Bind NCCL to the GPU at init so it connects eagerly rather than
+        # on the first collective. That makes init itself wait for rank 0's
+        # NCCL id, so this stays behind the same opt-in as the backend
+        device_id = torch.device('cuda:0')
+    else:
+        device_id = None
+    print(f"Backend: {backend}")
     
+    # One rendezvous with the backend chosen above; a failed attempt is
+    # reported right away instead of falling through to other backends
     try:
-        # Try different initialization methods with anti-libuv settings
-        
-        # Method 1: Force TCP transport without libuv
-        try:
-            print("Trying TCP transport initialization (no libuv)...")
-            
-            # Additional environment settings to force TCP
-            os.environ['GLOO_SOCKET_IFNAME'] = ''
-            os.environ['NCCL_SOCKET_IFNAME'] = ''
-            
-            # Initialize with explicit TCP backend
-            init_method = f'tcp://{master_addr}:{master_port}'
-            dist.init_process_group(
-                backend='gloo', 
-                init_method=init_method,
-                rank=RANK,
-                world_size=WORLD_SIZE,
-                timeout=torch.distributed.constants.default_pg_timeout
-            )
-            print(f"✅ TCP transport successful!")
-            return True
-        except Exception as e1:
-            print(f"TCP transport failed: {e1}")
-        
-        # Method 2: Try with MPI backend if available
-        try:
-            if dist.is_mpi_available():
-                print("Trying MPI backend initialization...")
-                dist.init_process_group(backend='mpi', rank=RANK, world_size=WORLD_SIZE)
-                print(f"✅ MPI backend successful!")
-                return True
-            else:
-                print("MPI backend not available, skipping...")
-        except Exception as e2:
-            print(f"MPI backend failed: {e2}")
+        print("Trying TCP store initialization...")
         
-        # Method 3: Environment variable method as fallback
-        try:
-            print("Trying environment variable initialization...")
-            dist.init_process_group(backend='gloo')
-            print(f"✅ Environment method successful!")
-            return True
-        except Exception as e3:
-            print(f"Environment method failed: {e3}")
-        
-        # If all methods fail
-        print(f"❌ All initialization methods failed")
-        print("This appears to be a PyTorch build issue with libuv support")
-        return False
+        # Join the coordinator's store as soon as it is listening, then
+        # hand it to the process group instead of a tcp:// rendezvous. The
+        # tcp:// path namespaces the rendezvous keys under "default_pg",
+        # which the coordinator still uses, so apply the same prefix; the
+        # raw store is kept for the shutdown key
+        store = connect_store(master_addr, master_port, WORLD_SIZE, timeout)
+        dist.init_process_group(
+            backend=backend, 
+            store=dist.PrefixStore("default_pg", store),
+            rank=RANK,
+            world_size=WORLD_SIZE,
+            # timeout only bounds reaching the coordinator; collectives get
+            # their own, longer limit since rank 0 may be stepped by hand
+            timeout=timedelta(seconds=collective_timeout),
+            device_id=device_id
+        )
+        print(f"✅ TCP transport successful!")
+        record_worker_state(store, device_id)
+        if device_id is not None:
+            # Allocate the test buffers and let context creation finish now,
+            # during setup, so neither lands in the timed collective. NCCL
+            # itself already connected eagerly because of device_id
+            gather_buffers()
+            torch.cuda.synchronize(device_id)
+        return True
         
     except Exception as e:
         print(f"❌ Failed to initialize distributed worker: {e}")
+        if device_id is not None:
+            print("   NCCL connects at init: the coordinator must also run NCCL "
+                  "(use --backend gloo with the Mac coordinator)")
         print("\nTroubleshooting tips:")
         print("1. Ensure both machines are on the same network")
         print("2. Check that the Mac's IP address is correct")
         print("3. Verify port 12355 is not blocked by firewall")
         print("4. Make sure the Mac coordinator is running first")
         print("5. Try restarting both Python processes")
+        # Don't leave a half-built default group behind
+        if dist.is_initialized():
+            dist.destroy_process_group()
         return False
 
+def gather_buffers(width=2):
+    """All-gather output list and input tensor, allocated once and reused"""
+    if "gather_out" not in _WORKER_STATE:
+        world_size = _WORKER_STATE["world_size"]
+        # One device allocation backs the input and every output slot;
+        # all_gather overwrites the outputs, so they don't need zeroing.
+        # Allocated as inference tensors whoever calls first (the test or
+        # the NCCL warm-up after init), to match the inference_mode test
+        with torch.inference_mode():
+            backing = torch.empty(
+                1 + world_size, width, dtype=torch.int64, device=_WORKER_STATE["device"]
+            )
+            gather_in, *gather_out = backing.unbind(0)
+        _WORKER_STATE["gather_in"] = gather_in
+        _WORKER_STATE["gather_out"] = gather_out
+    return _WORKER_STATE["gather_out"], _WORKER_STATE["gather_in"]
+
+def start_log_listener():
+    """Route log records through a queue to a background console writer"""
+    records = queue.SimpleQueue()
+    # Only the worker's own logger: configuring the root logger would also
+    # surface every library's INFO records, torch.distributed's included
+    log.setLevel(logging.INFO)
+    log.addHandler(logging.handlers.QueueHandler(records))
+    log.propagate = False
+    listener = logging.handlers.QueueListener(records, logging.StreamHandler(sys.stdout))
+    listener.start()
+    return listener
+
+@torch.inference_mode()
 def test_simple_operations():
     """Test simple distributed operations"""
     
     if not dist.is_initialized():
-        print("❌ Distributed not initialized")
+        log.error("❌ Distributed not initialized")
         return False
     
-    rank = dist.get_rank()
-    world_size = dist.get_world_size()
-    device = torch.device("cuda:0" if torch.cuda.is_available() else "cpu")
+    rank = _WORKER_STATE["rank"]
+    device = _WORKER_STATE["device"]
     
-    print(f"\n=== Simple Distributed Test ===")
-    print(f"Rank {rank} (Windows RTX 2050): Running on device {device}")
+    log.info(f"\n=== Simple Distributed Test ===")
+    log.info(f"Rank {rank} (Windows RTX 2050): Running on device {device}")
     
     try:
         # Test 1: Simple tensor creation and barrier
-        print("\n--- Test 1: Barrier Synchronization ---")
-        print(f"Rank {rank}: Waiting at barrier...")
-        dist.barrier()
-        print(f"Rank {rank}: Barrier passed!")
+        log.info("\n--- Test 1: Barrier Synchronization ---")
+        log.info(f"Rank {rank}: Waiting at barrier...")
+        device_id = _WORKER_STATE["device_id"]
+        if device_id is not None:
+            # Name the GPU so NCCL doesn't have to guess (and probe) one
+            dist.barrier(device_ids=[device_id.index])
+        else:
+            dist.barrier()
+        log.info(f"Rank {rank}: Barrier passed!")
         
         # Test 2: Simple all_gather
-        print("\n--- Test 2: Simple All-Gather ---")
-        tensor_list = [torch.zeros(2, dtype=torch.int64) for _ in range(world_size)]
-        input_tensor = torch.tensor([rank * 10, rank * 10 + 1], dtype=torch.int64)
+        log.info("\n--- Test 2: Simple All-Gather ---")
+        tensor_list, input_tensor = gather_buffers()
+        torch.arange(rank * 10, rank * 10 + 2, out=input_tensor)
         
-        # Move to device if CUDA available
         if device.type == 'cuda':
-            tensor_list = [t.to(device) for t in tensor_list]
-            input_tensor = input_tensor.to(device)
-        
-        print(f"Rank {rank}: Input tensor: {input_tensor}")
-        
-        dist.all_gather(tensor_list, input_tensor)
-        
-        # Synchronize GPU if needed
-        if device.type == 'cuda':
-            torch.cuda.synchronize()
+            # Time the collective with events on the current stream rather
+            # than fencing the whole device before and after it
+            start = torch.cuda.Event(enable_timing=True)
+            end = torch.cuda.Event(enable_timing=True)
+            start.record()
+            dist.all_gather(tensor_list, input_tensor)
+            end.record()
+            end.synchronize()
+            elapsed_ms = start.elapsed_time(end)
+        else:
+            # Gloo's CPU all_gather is synchronous; perf_counter_ns is
+            # monotonic and sub-microsecond, unlike time.time() on Windows
+            start_ns = time.perf_counter_ns()
+            dist.all_gather(tensor_list, input_tensor)
+            elapsed_ms = (time.perf_counter_ns() - start_ns) / 1e6
         
-        print(f"Rank {rank}: Gathered tensors: {tensor_list}")
+        # Report only after the collective so the host copies of the CUDA
+        # tensors stay out of the measured region; the console write itself
+        # happens on the log listener thread
+        log.info("\n".join([
+            f"Rank {rank}: Input tensor: {input_tensor}",
+            f"Rank {rank}: Gathered tensors: {tensor_list}",
+            f"Rank {rank}: All-gather took {elapsed_ms:.3f} ms",
+        ]))
         
         return True
         
     except Exception as e:
-        print(f"❌ Test failed: {e}")
+        log.error(f"❌ Test failed: {e}")
+        return False
+
+def is_store_timeout(e):
+    """True if a store wait ran out of time rather than losing the connection"""
+    if isinstance(e, getattr(dist, "DistNetworkError", ())):
+        return False
+    return "timeout" in str(e).lower()
+
+def wait_for_shutdown(store):
+    """Park until the coordinator sets SHUTDOWN_KEY in the store (or Ctrl+C)"""
+    shutdown = threading.Event()
+    
+    def watch():
+        try:
+            while True:
+                try:
+                    store.wait([SHUTDOWN_KEY], timedelta(days=1))
+                    break
+                except RuntimeError as e:
+                    # A quiet day is not a lost coordinator; wait again
+                    if not is_store_timeout(e):
+                        raise
+            log.info(f"\n🛑 Shutdown requested by coordinator")
+        except Exception as e:
+            log.error(f"\n🛑 Lost coordinator store: {e}")
+        finally:
+            shutdown.set()
+    
+    if store is not None:
+        threading.Thread(target=watch, daemon=True).start()
+    
+    # Ctrl+C (and Ctrl+Break on Windows) end the wait cleanly instead of
+    # raising KeyboardInterrupt
+    def on_signal(signum, frame):
+        log.info(f"\n🛑 Worker shutting down...")
+        shutdown.set()
+    
+    stop_signals = [signal.SIGINT]
+    if hasattr(signal, "SIGBREAK"):
+        stop_signals.append(signal.SIGBREAK)
+    previous = {sig: signal.signal(sig, on_signal) for sig in stop_signals}
+    
+    try:
+        if sys.platform == "win32":
+            # Untimed lock waits can't be interrupted by Ctrl+C on Windows
+            while not shutdown.wait(1):
+                pass
+        else:
+            shutdown.wait()
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+
+def is_valid_ip(value):
+    """True for a well-formed IP address that isn't loopback"""
+    try:
+        return not ipaddress.ip_address(value).is_loopback
+    except ValueError:
         return False
 
+def resolve_master_addr(value):
+    """Resolve value to a numeric IPv4 address once, or None if it isn't usable"""
+    if not value:
+        return None
+    try:
+        ip = socket.gethostbyname(value)
+        socket.inet_aton(ip)
+    except OSError:
+        return None
+    return ip if is_valid_ip(ip) else None
+
+def parse_args():
+    """Worker configuration from the command line, falling back to env vars"""
+    parser = argparse.ArgumentParser(description="Windows RTX 2050 distributed worker")
+    parser.add_argument("--master-addr", default=os.environ.get("MASTER_ADDR"),
+                        help="Mac coordinator IP (env: MASTER_ADDR; prompted if unset)")
+    # String defaults go through type=int too, so a bad MASTER_PORT, RANK
+    # or WORLD_SIZE is a usage error rather than a traceback
+    parser.add_argument("--master-port", type=int, default=os.environ.get("MASTER_PORT", "12355"))
+    parser.add_argument("--rank", type=int, default=os.environ.get("RANK", "1"))
+    parser.add_argument("--world-size", type=int, default=os.environ.get("WORLD_SIZE", "2"))
+    parser.add_argument("--backend", choices=["gloo", "nccl"], default="gloo",
+                        help="Collective backend; nccl only works if every rank, including "
+                             "the coordinator, uses it (the Mac can only run gloo)")
+    parser.add_argument("--timeout", type=int, default=30,
+                        help="Seconds to wait for the coordinator to accept the connection")
+    parser.add_argument("--collective-timeout", type=int, default=1800,
+                        help="Seconds each collective (barrier, all_gather) may wait for "
+                             "the coordinator before failing")
+    return parser.parse_args()
+
 def main():
     """Main function to run the Windows worker"""
     
+    args = parse_args()
+    
     print("🚀 Windows RTX 2050 Distributed Worker (Fixed)")
     print("=" * 50)
     
@@ -197,24 +460,38 @@ def main():
     if not check_cuda_setup():
         sys.exit(1)
     
+    # Context creation takes ~0.5-1 s on Windows; overlap it with the
+    # address lookup (and the prompt, if there is one)
+    warm_up_cuda()
+    
     # Get local IP for reference
     local_ip = get_local_ip()
     print(f"\nThis Windows machine IP: {local_ip}")
     
-    # Get Mac's IP address
-    print("\n" + "=" * 50)
-    print("CONFIGURATION REQUIRED:")
-    print("=" * 50)
-    print("Please enter your Mac's IP address")
-    
-    while True:
-        master_addr = input("\nEnter Mac's IP address: ").strip()
-        if master_addr and master_addr != "127.0.0.1":
-            break
-        print("Please enter a valid IP address (not localhost)")
+    # Get Mac's IP address, prompting only if it wasn't passed in. Names
+    # are resolved here, once, so Gloo only ever sees the numeric address
+    if args.master_addr:
+        master_addr = resolve_master_addr(args.master_addr)
+        if master_addr is None:
+            print(f"❌ Can't resolve master address {args.master_addr!r} to a usable IPv4 address")
+            sys.exit(1)
+    else:
+        print("\n" + "=" * 50)
+        print("CONFIGURATION REQUIRED:")
+        print("=" * 50)
+        print("Please enter your Mac's IP address")
+        
+        while True:
+            master_addr = resolve_master_addr(input("\nEnter Mac's IP address: ").strip())
+            if master_addr:
+                break
+            print("Please enter a valid IP address or hostname (not localhost)")
     
     # Initialize distributed worker
-    if not initialize_distributed_worker(master_addr):
+    if not initialize_distributed_worker(
+        master_addr, args.master_port, args.timeout, args.rank, args.world_size,
+        args.backend, args.collective_timeout
+    ):
         print("\n💡 Try these solutions:")
         print("1. Restart the Mac coordinator")
         print("2. Check Mac firewall settings")
@@ -224,35 +501,39 @@ def main():
         print("6. This might be a PyTorch libuv build issue - consider using a different PyTorch version")
         sys.exit(1)
     
+    # Console writes from here on happen off the calling thread; main logs
+    # too so its lines stay ordered after the test's
+    listener = start_log_listener()
     try:
-        print(f"\n✅ Distributed initialization successful!")
-        print(f"Rank: {dist.get_rank()}, World size: {dist.get_world_size()}")
+        log.info(f"\n✅ Distributed initialization successful!")
+        log.info(f"Rank: {_WORKER_STATE['rank']}, World size: {_WORKER_STATE['world_size']}")
         
         # Run simple tests
         if test_simple_operations():
-            print(f"\n🎉 Windows worker is operational!")
-            print(f"🎯 GPU: {torch.cuda.get_device_name(0) if torch.cuda.is_available() else 'CPU'}")
-            print(f"🌐 Connected to Mac coordinator at {master_addr}")
-            print(f"⏳ Ready for distributed operations...")
+            log.info(f"\n🎉 Windows worker is operational!")
+            log.info(f"🎯 GPU: {_gpu_name() if torch.cuda.is_available() else 'CPU'}")
+            log.info(f"🌐 Connected to Mac coordinator at {master_addr}")
+            log.info(f"⏳ Ready for distributed operations...")
             
-            # Keep worker alive
-            print("\nPress Ctrl+C to stop the worker...")
-            while True:
-                time.sleep(1)
+            # Keep worker alive until the coordinator or the user stops it
+            log.info(f"\nPress Ctrl+C (or set '{SHUTDOWN_KEY}' in the store) to stop the worker...")
+            wait_for_shutdown(_WORKER_STATE["store"])
         else:
-            print("❌ Tests failed")
+            log.error("❌ Tests failed")
             
     except KeyboardInterrupt:
-        print(f"\n🛑 Worker shutting down...")
+        log.info(f"\n🛑 Worker shutting down...")
     except Exception as e:
-        print(f"\n❌ Error during operations: {e}")
+        log.error(f"\n❌ Error during operations: {e}")
     finally:
         try:
             if dist.is_initialized():
                 dist.destroy_process_group()
-                print("✅ Distributed process group destroyed")
+                log.info("✅ Distributed process group destroyed")
         except:
             pass
+        # Stopping the listener flushes whatever is still queued
+        listener.stop()
 
 if __name__ == "__main__":
     main()
@@ -1,8 +1,16 @@
+import argparse
 import os
 import socket
+import sys
+from datetime import timedelta
 import torch
 import torch.distributed as dist
 
+# WSL2's default network interface
+SOCKET_IFNAME = "eth0"
+
+HOSTNAME = socket.gethostname()
+
 
 def infer_device() -> torch.device:
     if torch.cuda.is_available():
@@ -13,24 +21,69 @@ def infer_device() -> torch.device:
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--gloo-connections",
+        type=int,
+        default=4,
+        help="TCP connections (and I/O threads) Gloo opens per peer",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=int,
+        default=60,
+        help="Seconds to wait on rendezvous/collectives before failing",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Print per-rank results on every rank, not just rank 0",
+    )
+    args = parser.parse_args()
+
     # Use NCCL for GPU, Gloo for CPU
-    # NCCL is much faster for GPU-to-GPU communication
-    backend = "nccl" if torch.cuda.is_available() else "gloo"
+    # NCCL is much faster for GPU-to-GPU communication; registering both lets
+    # small CPU control tensors stay on Gloo instead of detouring via the GPU
+    use_nccl = torch.cuda.is_available() and dist.is_nccl_available()
+    backend = "cpu:gloo,cuda:nccl" if use_nccl else "gloo"
+    local_rank = int(os.environ.get("LOCAL_RANK", 0))
+    pg_options = None
     
     # Configure NCCL for cross-machine communication
-    if backend == "nccl":
+    if use_nccl:
+        # Pin this process to its GPU before NCCL creates its communicator
+        torch.cuda.set_device(local_rank)
+        # Run NCCL kernels on a high-priority stream so they are not
+        # queued behind compute
+        pg_options = dist.ProcessGroupNCCL.Options(is_high_priority_stream=True)
         # Set NCCL to use TCP for cross-machine (not IB/RoCE)
         os.environ['NCCL_IB_DISABLE'] = '1'
         os.environ['NCCL_P2P_DISABLE'] = '1'
         # Use TCP sockets
-        os.environ['NCCL_SOCKET_IFNAME'] = 'eth0'
+        os.environ['NCCL_SOCKET_IFNAME'] = SOCKET_IFNAME
         # Enable debug for troubleshooting
         os.environ['NCCL_DEBUG'] = 'INFO'
     
+    # Gloo opens one connection per listed interface, so repeating the same
+    # interface spreads its traffic over several sockets and I/O threads
+    if SOCKET_IFNAME in {name for _, name in socket.if_nameindex()}:
+        os.environ.setdefault(
+            "GLOO_SOCKET_IFNAME", ",".join([SOCKET_IFNAME] * args.gloo_connections)
+        )
+
+    # libuv TCPStore rendezvous is async and much faster to bring up; the
+    # Windows wheels are built without it, so only opt in elsewhere
+    if sys.platform != "win32":
+        os.environ.setdefault("USE_LIBUV", "1")
+
     print(f"Initializing with backend: {backend}")
     
     # torchrun provides env:// rendezvous; do not pass store/init_method here
-    dist.init_process_group(backend=backend)
+    dist.init_process_group(
+        backend=backend,
+        timeout=timedelta(seconds=args.timeout),
+        pg_options=pg_options
+    )
 
     rank = dist.get_rank()
     world_size = dist.get_world_size()
@@ -38,17 +91,37 @@ def main() -> None:
 
     print(
         f"[rank {rank}] world_size={world_size} device={device} "
-        f"hostname={socket.gethostname()}"
+        f"hostname={HOSTNAME}"
     )
 
-    # Simple cross-rank check: gather all ranks
-    # Move tensors to GPU if using NCCL
-    gathered_ranks = [torch.zeros(1, dtype=torch.int64, device=device) for _ in range(world_size)]
-    my_rank_tensor = torch.tensor([rank], dtype=torch.int64, device=device)
-    dist.all_gather(gathered_ranks, my_rank_tensor)
-    print(f"[rank {rank}] gathered={ [int(t.item()) for t in gathered_ranks] }")
+    # Simple cross-rank check: gather all ranks into one contiguous buffer
+    # With NCCL the buffer lives on the GPU so the gather actually goes
+    # through NCCL (this is the NCCL connectivity check); otherwise Gloo
+    # carries it on CPU. One scratch allocation backs both the send and
+    # receive side.
+    gather_device = torch.device("cuda", local_rank) if use_nccl else torch.device("cpu")
+    scratch = torch.empty(world_size + 1, dtype=torch.int64, device=gather_device)
+    gathered_ranks, my_rank_tensor = scratch[:world_size], scratch[world_size:]
+    my_rank_tensor.fill_(rank)
+    if hasattr(dist, "all_gather_into_tensor"):
+        gather_work = dist.all_gather_into_tensor(
+            gathered_ranks, my_rank_tensor, async_op=True
+        )
+    else:
+        gather_work = dist.all_gather(
+            list(gathered_ranks.chunk(world_size)), my_rank_tensor, async_op=True
+        )
+
+    # Queue the barrier right behind the gather and wait once for both, so
+    # neither waits on the other's round-trip plus a print
+    barrier_work = dist.barrier(async_op=True)
+    gather_work.wait()
+    barrier_work.wait()
 
-    dist.barrier()
+    # Only rank 0 formats results by default; on the NCCL path .tolist()
+    # copies the GPU buffer back to the host, so keep it off the other ranks
+    if rank == 0 or args.verbose:
+        print(f"[rank {rank}] gathered={gathered_ranks.tolist()}")
     print(f"[rank {rank}] barrier OK; shutting down")
     dist.destroy_process_group()
 